@@ -9,3 +9,6 @@ class Addr:
 
         self.col = addr[:i]
         self.row = int(addr[i:])
+
+    def __str__(self) -> str:
+        return f'{self.col}{self.row}'
@@ -0,0 +1,102 @@
+from collections import deque
+from typing import Dict, List, Set
+
+from addr import Addr
+from spreadsheet import Cell, Sheet
+
+
+# Read-only snapshot of a sheet's dependency graph; queries are linear in cells plus references. Cells in or downstream of
+# a cycle are reported by `cyclic_cells` and left out of the depth, levels and critical paths.
+class DependencyGraph:
+    addrs: Dict[Cell, str]
+    cells: Dict[str, Cell]
+    order: List[Cell]  # topologically sorted
+    cyclic: List[Cell]  # cells in or downstream of a cycle
+    levels: Dict[Cell, int]  # length of the longest chain of dependencies leading to the cell
+
+    def __init__(self, sheet: Sheet):
+        self.addrs = {}
+        for col, rows in sheet.cells.items():
+            for row, cell in rows.items():
+                self.addrs[cell] = f'{col}{row}'
+
+        self.order = Cell.partially_topologically_sorted(list(self.addrs))
+        sorted_cells = set(self.order)
+        self.cyclic = [c for c in self.addrs if c not in sorted_cells]
+
+        self.levels = {}
+        for cell in self.order:
+            self.levels[cell] = max((self.levels[d] + 1 for d in cell.dependencies), default=0)
+
+        self.cells = {addr: cell for cell, addr in self.addrs.items()}
+
+    def get_cell(self, addr: str) -> Cell:
+        return self.cells[str(Addr(addr))]
+
+    def cyclic_cells(self) -> List[str]:
+        return [self.addrs[c] for c in self.cyclic]
+
+    # number of cells in the longest chain of dependencies
+    def depth(self) -> int:
+        return max(self.levels.values(), default=-1) + 1
+
+    # number of cells in each topological level; cells in the same level can be evaluated in parallel
+    def level_widths(self) -> List[int]:
+        result = [0] * self.depth()
+        for level in self.levels.values():
+            result[level] += 1
+
+        return result
+
+    # number of cells that have to be recalculated, besides the cell itself, when the cell at `addr` changes
+    def transitive_fan_out(self, addr: str) -> int:
+        return len(self.reachable_from(self.get_cell(addr))) - 1
+
+    # the longest chain of cells that has to be recalculated one after another when the cell at `addr` changes
+    def critical_path(self, addr: str) -> List[str]:
+        start = self.get_cell(addr)
+        reachable = self.reachable_from(start)
+
+        length = {start: 1}
+        previous = {}
+        for cell in self.order:
+            if cell in reachable and cell is not start:
+                previous[cell] = max((d for d in cell.dependencies if d in length), key=length.get)
+                length[cell] = length[previous[cell]] + 1
+
+        cell = max(length, key=length.get)
+        result = [self.addrs[cell]]
+        while cell in previous:
+            cell = previous[cell]
+            result.append(self.addrs[cell])
+
+        return result[::-1]
+
+    def reachable_from(self, cell: Cell) -> Set[Cell]:
+        result = {cell}
+        queue = deque([cell])
+        while queue:
+            for d in queue.popleft().dependents:
+                if d not in result:
+                    result.add(d)
+                    queue.append(d)
+
+        return result
+
+    # one "«DEPENDENCY» «DEPENDENT»" pair per line, in topological order followed by the cyclic cells
+    def to_edge_list(self) -> str:
+        return ''.join(
+            f'{self.addrs[cell]} {self.addrs[d]}\n'
+            for cell in self.order + self.cyclic
+            for d in cell.dependents)
+
+    def to_dot(self) -> str:
+        lines = ['digraph sheet {']
+        for cell in self.order + self.cyclic:
+            if not cell.dependencies and not cell.dependents:
+                lines.append(f'  "{self.addrs[cell]}";')
+            for d in cell.dependents:
+                lines.append(f'  "{self.addrs[cell]}" -> "{self.addrs[d]}";')
+        lines.append('}')
+
+        return '\n'.join(lines) + '\n'
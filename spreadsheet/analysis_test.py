@@ -0,0 +1,86 @@
+import unittest
+
+from analysis import DependencyGraph
+from spreadsheet import Sheet
+
+
+class TestDependencyGraph(unittest.TestCase):
+    @staticmethod
+    def sheet() -> Sheet:
+        # A1 ─┬─ B1 ── C1 ── D1
+        #     └─ B2 ─────────┘
+        sheet = Sheet()
+        sheet.set_contents("A1", "1")
+        sheet.set_contents("B1", "=A1")
+        sheet.set_contents("B2", "=A1*2")
+        sheet.set_contents("C1", "=B1")
+        sheet.set_contents("D1", "=C1+B2")
+        sheet.set_contents("E1", "7")
+
+        return sheet
+
+    def test_depth(self):
+        self.assertEqual(4, DependencyGraph(TestDependencyGraph.sheet()).depth())
+
+    def test_depth_empty(self):
+        self.assertEqual(0, DependencyGraph(Sheet()).depth())
+
+    def test_level_widths(self):
+        self.assertEqual([2, 2, 1, 1], DependencyGraph(TestDependencyGraph.sheet()).level_widths())
+
+    def test_transitive_fan_out(self):
+        graph = DependencyGraph(TestDependencyGraph.sheet())
+
+        self.assertEqual(4, graph.transitive_fan_out("A1"))
+        self.assertEqual(1, graph.transitive_fan_out("B2"))
+        self.assertEqual(0, graph.transitive_fan_out("E1"))
+
+    def test_critical_path(self):
+        graph = DependencyGraph(TestDependencyGraph.sheet())
+
+        self.assertEqual(["A1", "B1", "C1", "D1"], graph.critical_path("A1"))
+        self.assertEqual(["B2", "D1"], graph.critical_path("B2"))
+        self.assertEqual(["E1"], graph.critical_path("E1"))
+
+    def test_to_edge_list(self):
+        expected = "A1 B1\nA1 B2\nB1 C1\nB2 D1\nC1 D1\n"
+
+        actual = DependencyGraph(TestDependencyGraph.sheet()).to_edge_list()
+
+        self.assertEqual(sorted(expected.splitlines()), sorted(actual.splitlines()))
+
+    def test_to_dot(self):
+        actual = DependencyGraph(TestDependencyGraph.sheet()).to_dot()
+
+        self.assertTrue(actual.startswith('digraph sheet {\n'))
+        self.assertIn('  "A1" -> "B1";\n', actual)
+        self.assertIn('  "C1" -> "D1";\n', actual)
+        self.assertIn('  "E1";\n', actual)
+        self.assertTrue(actual.endswith('}\n'))
+
+    def test_cyclic_cells(self):
+        # A1 ── B1 ⇄ C1 ── D1
+        sheet = Sheet()
+        sheet.set_contents("A1", "1")
+        sheet.set_contents("B1", "=A1+C1")
+        sheet.set_contents("C1", "=B1")
+        sheet.set_contents("D1", "=C1")
+        sheet.set_contents("E1", "=A1")
+
+        graph = DependencyGraph(sheet)
+
+        self.assertEqual({"B1", "C1", "D1"}, set(graph.cyclic_cells()))
+        self.assertEqual(2, graph.depth())
+        self.assertEqual([1, 1], graph.level_widths())
+        self.assertEqual(4, graph.transitive_fan_out("A1"))
+        self.assertEqual(["A1", "E1"], graph.critical_path("A1"))
+        self.assertEqual(["B1"], graph.critical_path("B1"))
+        self.assertIn('  "C1" -> "B1";\n', graph.to_dot())
+        self.assertIn("B1 C1\n", graph.to_edge_list())
+
+    def test_cyclic_cells_none(self):
+        self.assertEqual([], DependencyGraph(TestDependencyGraph.sheet()).cyclic_cells())
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,128 @@
+import gc
+import hashlib
+import os
+import pickle
+from contextlib import contextmanager
+from typing import Dict, Iterator, List, Optional, Tuple, Union
+
+import parser
+from addr import Addr
+from expr import Expr, Number
+from numeric import NumericMode
+
+VERSION = 3  # bump whenever the cached format or the parser's postfix programs change
+
+Location = Tuple[str, int]  # (col, row) of a cell
+Program = Tuple[Tuple[str, str], ...]
+
+
+# Loading allocates objects by the million and frees none of them, so every collection the garbage collector triggers
+# along the way rescans an ever-growing heap for nothing.
+@contextmanager
+def paused_gc() -> Iterator[None]:
+    enabled = gc.isenabled()
+    gc.disable()
+    try:
+        yield
+    finally:
+        if enabled:
+            gc.enable()
+
+
+# Keeps parsed formulas, by text, and the last loaded sheet's contents, order and values across restarts. A file that
+# is corrupt or doesn't hang together is ignored, which just means a cold start.
+class FormulaCache:
+    path: str
+    formulas: Dict[str, Tuple[Program, Tuple[Location, ...]]]  # formula text -> (program, references)
+    mode: Optional[Union[str, Tuple]]  # reduced form of the mode `values` were computed in
+    contents: Dict[str, str]  # contents of the sheet last loaded
+    locations: Dict[str, Location]  # address in `contents` -> location
+    order: List[Location]  # topologically sorted
+    values: List[Number]  # value of each cell in `order`
+
+    def __init__(self, path: str):
+        self.path = path
+        self.formulas = {}
+        self.mode = None
+        self.contents = {}
+        self.locations = {}
+        self.order = []
+        self.values = []
+
+        try:
+            with open(path, 'rb') as f:
+                digest = f.read(hashlib.sha256().digest_size)
+                payload = f.read()
+            if hashlib.sha256(payload).digest() != digest:
+                return
+
+            with paused_gc():
+                data = pickle.loads(payload)
+
+            if data['version'] != VERSION:
+                return
+
+            formulas, mode, contents = data['formulas'], data['mode'], data['contents']
+            locations, order, values = data['locations'], data['order'], data['values']
+            FormulaCache.validate(formulas, contents, locations, order, values)
+        except Exception:
+            return
+
+        self.formulas = formulas
+        self.mode = mode
+        self.contents = contents
+        self.locations = locations
+        self.order = order
+        self.values = values
+
+    # Only the formulas of the sheet last loaded are written so that the file doesn't grow without bound.
+    def save(self):
+        data = {
+            'version': VERSION,
+            'formulas': {c: self.formulas[c] for c in set(self.contents.values())},
+            'mode': self.mode,
+            'contents': self.contents,
+            'locations': self.locations,
+            'order': self.order,
+            'values': self.values
+        }
+
+        payload = pickle.dumps(data, protocol=pickle.HIGHEST_PROTOCOL)
+
+        tmp_path = f'{self.path}.tmp'
+        with open(tmp_path, 'wb') as f:
+            f.write(hashlib.sha256(payload).digest())
+            f.write(payload)
+        os.replace(tmp_path, self.path)
+
+    # raises ValueError unless every cell `Sheet.restore` will look up is there
+    @staticmethod
+    def validate(
+            formulas: Dict[str, Tuple[Program, Tuple[Location, ...]]],
+            contents: Dict[str, str],
+            locations: Dict[str, Location],
+            order: List[Location],
+            values: List[Number]):
+        ordered = set(order)
+        if len(ordered) != len(order) or len(values) != len(order) or locations.keys() != contents.keys():
+            raise ValueError("Inconsistent cache")
+
+        for addr, c in contents.items():
+            _, refs = formulas[c]
+            if locations[addr] not in ordered or not ordered.issuperset(refs):
+                raise ValueError("Inconsistent cache")
+
+    # Like `Sheet.convert_contents_to_callable` but a formula seen before is compiled from its cached program instead
+    # of being parsed again.
+    def convert_contents_to_callable(self, contents: str, mode: NumericMode) -> Tuple[Expr, Tuple[Location, ...]]:
+        if contents in self.formulas:
+            program, refs = self.formulas[contents]
+
+            return parser.compile_lazily(program, mode), refs
+
+        p = parser.Parser(parser.tokenize_contents(contents), mode)
+        expr, addr_refs = p.parse()
+        refs = tuple((a.col, a.row) for a in map(Addr, addr_refs))
+        self.formulas[contents] = (tuple(p.program), refs)
+
+        return expr, refs
@@ -0,0 +1,173 @@
+import hashlib
+import os
+import pickle
+import tempfile
+import unittest
+from unittest.mock import patch
+
+import numeric
+import parser
+from cache import FormulaCache
+from spreadsheet import Cell, Sheet
+
+
+class TestFormulaCache(unittest.TestCase):
+    CONTENTS = {"A1": "2", "A2": "=A1*3", "B1": "=A2-A1", "B2": "7"}
+
+    def setUp(self):
+        self.dir = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.dir.name, 'sheet.cache')
+
+    def tearDown(self):
+        self.dir.cleanup()
+
+    def save(self, contents, mode=numeric.INT):
+        cache = FormulaCache(self.path)
+        Sheet.load(contents, mode, cache)
+        cache.save()
+
+    def test_unchanged(self):
+        self.save(TestFormulaCache.CONTENTS)
+
+        cache = FormulaCache(self.path)
+        with patch('parser.tokenize') as tokenize, \
+                patch('parser.compile_program', wraps=parser.compile_program) as compile_program, \
+                patch.object(Cell, 'partially_topologically_sorted') as partially_topologically_sorted:
+            sheet = Sheet.load(dict(reversed(TestFormulaCache.CONTENTS.items())), cache=cache)
+
+            tokenize.assert_not_called()
+            partially_topologically_sorted.assert_not_called()
+            compile_program.assert_not_called()
+
+        self.assertEqual(6, sheet.get_val("A2"))
+        self.assertEqual(4, sheet.get_val("B1"))
+
+        sheet.set_contents("A1", "5")
+
+        self.assertEqual(15, sheet.get_val("A2"))
+        self.assertEqual(10, sheet.get_val("B1"))
+
+    def test_changed_contents(self):
+        self.save(TestFormulaCache.CONTENTS)
+
+        cache = FormulaCache(self.path)
+        with patch('parser.tokenize', wraps=parser.tokenize) as tokenize, \
+                patch('parser.compile_program', wraps=parser.compile_program) as compile_program:
+            sheet = Sheet.load({**TestFormulaCache.CONTENTS, "A1": "3", "B2": "=B1"}, cache=cache)
+
+            self.assertEqual(2, tokenize.call_count)  # only the new formulas
+            self.assertEqual(2, compile_program.call_count)  # A2 and B1, downstream of A1
+
+        self.assertEqual(9, sheet.get_val("A2"))
+        self.assertEqual(6, sheet.get_val("B1"))
+        self.assertEqual(6, sheet.get_val("B2"))
+
+    def test_removed_contents(self):
+        self.save(TestFormulaCache.CONTENTS)
+
+        contents = dict(TestFormulaCache.CONTENTS)
+        del contents["A1"]
+        sheet = Sheet.load(contents, cache=FormulaCache(self.path))
+
+        self.assertEqual(0, sheet.get_val("A1"))
+        self.assertEqual(0, sheet.get_val("A2"))
+
+    def test_changed_mode(self):
+        self.save({"A1": "7", "A2": "=A1/2"})
+
+        sheet = Sheet.load({"A1": "7", "A2": "=A1/2"}, numeric.FLOAT, FormulaCache(self.path))
+
+        self.assertEqual(3.5, sheet.get_val("A2"))
+
+    def test_save_drops_unused_formulas(self):
+        self.save({"A1": "2"})
+        self.save({"A1": "3"})
+
+        self.assertEqual({"3"}, set(FormulaCache(self.path).formulas))
+
+    def test_corrupt_file(self):
+        with open(self.path, 'wb') as f:
+            f.write(b'\x80\x05garbage')
+
+        sheet = Sheet.load(TestFormulaCache.CONTENTS, cache=FormulaCache(self.path))
+
+        self.assertEqual(4, sheet.get_val("B1"))
+
+    def test_incompatible_file(self):
+        with open(self.path, 'wb') as f:
+            f.write(b'')
+        self.assertEqual({}, FormulaCache(self.path).formulas)
+
+        with open(self.path, 'wb') as f:
+            f.write(b'\x80\x04]\x94.')  # a pickled empty list
+        self.assertEqual({}, FormulaCache(self.path).formulas)
+
+    def test_flipped_bit(self):
+        self.save(TestFormulaCache.CONTENTS)
+
+        with open(self.path, 'r+b') as f:
+            f.seek(-2, os.SEEK_END)
+            byte = f.read(1)
+            f.seek(-2, os.SEEK_END)
+            f.write(bytes([byte[0] ^ 1]))
+
+        self.assertEqual({}, FormulaCache(self.path).formulas)
+
+        sheet = Sheet.load(TestFormulaCache.CONTENTS, cache=FormulaCache(self.path))
+
+        self.assertEqual(6, sheet.get_val("A2"))
+        self.assertEqual(4, sheet.get_val("B1"))
+
+    def test_inconsistent_file(self):
+        self.save(TestFormulaCache.CONTENTS)
+
+        with open(self.path, 'rb') as f:
+            data = pickle.loads(f.read()[hashlib.sha256().digest_size:])
+        del data['locations']["A2"]
+        data['values'][0] = 100
+        payload = pickle.dumps(data)
+        with open(self.path, 'wb') as f:
+            f.write(hashlib.sha256(payload).digest())
+            f.write(payload)
+
+        self.assertEqual({}, FormulaCache(self.path).formulas)
+
+        sheet = Sheet.load(TestFormulaCache.CONTENTS, cache=FormulaCache(self.path))
+
+        self.assertEqual(6, sheet.get_val("A2"))
+        self.assertEqual(4, sheet.get_val("B1"))
+
+    def test_unreadable_file(self):
+        self.save(TestFormulaCache.CONTENTS)
+
+        with patch('pickle.loads', side_effect=MemoryError):
+            self.assertEqual({}, FormulaCache(self.path).formulas)
+
+    def test_cyclic_reference(self):
+        contents = {"A1": "=B1", "B1": "=A1+1", "C1": "=A1", "D1": "2", "D2": "=D1*3"}
+
+        cold = Sheet.load(contents)
+        self.save(contents)
+        warm = Sheet.load(contents, cache=FormulaCache(self.path))
+
+        self.assertEqual(6, cold.get_val("D2"))
+        self.assertEqual(6, warm.get_val("D2"))
+        for addr in contents:
+            self.assertEqual(cold.get_val(addr), warm.get_val(addr))
+
+    def test_only_changed_cells_are_sorted(self):
+        self.save(TestFormulaCache.CONTENTS)
+
+        cache = FormulaCache(self.path)
+        with patch.object(Cell, 'partially_topologically_sorted',
+                          wraps=Cell.partially_topologically_sorted) as partially_topologically_sorted:
+            sheet = Sheet.load({**TestFormulaCache.CONTENTS, "C1": "=B1+1"}, cache=cache)
+
+            self.assertEqual(1, len(partially_topologically_sorted.call_args.args[0]))
+
+        self.assertEqual(5, sheet.get_val("C1"))
+        self.assertEqual((cache.locations["C1"], 5), (cache.order[-1], cache.values[-1]))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,3 +1,5 @@
-from typing import Callable
+from decimal import Decimal
+from typing import Callable, Union
 
-Expr = Callable[['Sheet'], int]
+Number = Union[int, float, Decimal]
+Expr = Callable[['Sheet'], Number]
@@ -0,0 +1,74 @@
+from decimal import Decimal
+from typing import Callable, Dict, Tuple, Union
+
+from expr import Expr, Number
+
+
+# Each mode carries its own operator table so that the closures built by the parser are specialized for the mode's
+# number type. Evaluation never has to check which mode it's in.
+class NumericMode:
+    zero: Number
+    literal: Callable[[str], Number]
+    operator: Dict[str, Callable[[Expr, Expr], Expr]]
+    reduced: Union[str, Tuple]  # how to rebuild this mode in another process since lambdas can't be pickled
+
+    def __init__(
+            self,
+            zero: Number,
+            literal: Callable[[str], Number],
+            operator: Dict[str, Callable[[Expr, Expr], Expr]],
+            reduced: Union[str, Tuple]):
+        self.zero = zero
+        self.literal = literal
+        self.operator = operator
+        self.reduced = reduced
+
+    def __reduce__(self) -> Union[str, Tuple]:
+        return self.reduced
+
+
+def _int_literal(value: str) -> int:
+    if not value.isdigit():
+        raise ValueError(f"Decimal literal in int mode: {value}")
+
+    return int(value)
+
+
+INT = NumericMode(
+    0,
+    _int_literal,
+    {
+        '+': lambda lhs, rhs: lambda sheet: lhs(sheet) + rhs(sheet),
+        '-': lambda lhs, rhs: lambda sheet: lhs(sheet) - rhs(sheet),
+        '*': lambda lhs, rhs: lambda sheet: lhs(sheet) * rhs(sheet),
+        '/': lambda lhs, rhs: lambda sheet: lhs(sheet) // rhs(sheet)
+    },
+    'INT')
+
+FLOAT = NumericMode(
+    0.0,
+    float,
+    {
+        '+': lambda lhs, rhs: lambda sheet: lhs(sheet) + rhs(sheet),
+        '-': lambda lhs, rhs: lambda sheet: lhs(sheet) - rhs(sheet),
+        '*': lambda lhs, rhs: lambda sheet: lhs(sheet) * rhs(sheet),
+        '/': lambda lhs, rhs: lambda sheet: lhs(sheet) / rhs(sheet)
+    },
+    'FLOAT')
+
+
+# Fixed-point decimal with `places` digits after the decimal point. Literals and the results of `*` and `/` are
+# rounded to `places`; `+` and `-` of values already at that scale stay at that scale.
+def fixed_point(places: int) -> NumericMode:
+    quantum = Decimal(1).scaleb(-places)
+
+    return NumericMode(
+        Decimal(0).quantize(quantum),
+        lambda value: Decimal(value).quantize(quantum),
+        {
+            '+': lambda lhs, rhs: lambda sheet: lhs(sheet) + rhs(sheet),
+            '-': lambda lhs, rhs: lambda sheet: lhs(sheet) - rhs(sheet),
+            '*': lambda lhs, rhs: lambda sheet: (lhs(sheet) * rhs(sheet)).quantize(quantum),
+            '/': lambda lhs, rhs: lambda sheet: (lhs(sheet) / rhs(sheet)).quantize(quantum)
+        },
+        (fixed_point, (places,)))
@@ -0,0 +1,58 @@
+import pickle
+import unittest
+from decimal import Decimal
+
+import numeric
+
+
+class TestNumericMode(unittest.TestCase):
+    @staticmethod
+    def evaluate(mode: numeric.NumericMode, op: str, lhs: str, rhs: str):
+        return mode.operator[op](lambda _: mode.literal(lhs), lambda _: mode.literal(rhs))(None)
+
+    def test_int_divide_floors(self):
+        expected = 3
+
+        actual = TestNumericMode.evaluate(numeric.INT, '/', "7", "2")
+
+        self.assertEqual(expected, actual)
+
+    def test_float_divide(self):
+        expected = 3.5
+
+        actual = TestNumericMode.evaluate(numeric.FLOAT, '/', "7", "2")
+
+        self.assertEqual(expected, actual)
+
+    def test_fixed_point_divide_rounds_to_places(self):
+        expected = Decimal("0.33")
+
+        actual = TestNumericMode.evaluate(numeric.fixed_point(2), '/', "1", "3")
+
+        self.assertEqual(expected.as_tuple(), actual.as_tuple())
+
+    def test_fixed_point_multiply_rounds_to_places(self):
+        expected = Decimal("0.02")
+
+        actual = TestNumericMode.evaluate(numeric.fixed_point(2), '*', "0.15", "0.15")
+
+        self.assertEqual(expected.as_tuple(), actual.as_tuple())
+
+    def test_fixed_point_add_keeps_places(self):
+        expected = Decimal("0.30")
+
+        actual = TestNumericMode.evaluate(numeric.fixed_point(2), '+', "0.1", "0.2")
+
+        self.assertEqual(expected.as_tuple(), actual.as_tuple())
+
+    def test_pickle_round_trip(self):
+        self.assertIs(numeric.INT, pickle.loads(pickle.dumps(numeric.INT)))
+        self.assertIs(numeric.FLOAT, pickle.loads(pickle.dumps(numeric.FLOAT)))
+
+        actual = TestNumericMode.evaluate(pickle.loads(pickle.dumps(numeric.fixed_point(2))), '/', "1", "3")
+
+        self.assertEqual(Decimal("0.33").as_tuple(), actual.as_tuple())
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,6 +1,8 @@
-from typing import List, Set, Tuple
+from typing import List, Optional, Set, Tuple
 
-from expr import Expr
+import numeric
+from expr import Expr, Number
+from numeric import NumericMode
 
 
 class Token:
@@ -14,27 +16,29 @@ class Token:
 
 # «EXPR» ≔ «TERM» { "+" «TERM» | "-" «TERM» }
 # «TERM» ≔ «FACTOR» { "*" «FACTOR» | "/" «FACTOR» }
-# «FACTOR» ≔ «INT» | «ADDR» | "-" «FACTOR» | "(" «EXPR» ")"
+# «FACTOR» ≔ «INT» | «DECIMAL» | «ADDR» | "-" «FACTOR» | "(" «EXPR» ")"
 # «ADDR» ≔ «COL» «ROW»
 # «COL» ≔ [A-Z]+
 # «ROW» ≔ «INT»
 # «INT» ≔ [0-9]+
+# «DECIMAL» ≔ [0-9]+ "." [0-9]+
+#
+# Alongside the callable, the parser records the formula as a postfix program of (type, value) pairs, e.g. "2*(A1+3)"
+# is (("INT", "2"), ("ADDR", "A1"), ("INT", "3"), ("+", ""), ("*", "")). Unlike the callable, it can be written to disk
+# and turned back into a callable with `compile_program` without parsing again.
 class Parser:
-    operator = {
-        '+': lambda lhs, rhs: lambda sheet: lhs(sheet) + rhs(sheet),
-        '-': lambda lhs, rhs: lambda sheet: lhs(sheet) - rhs(sheet),
-        '*': lambda lhs, rhs: lambda sheet: lhs(sheet) * rhs(sheet),
-        '/': lambda lhs, rhs: lambda sheet: lhs(sheet) // rhs(sheet)
-    }
-
     tokens: List[Token]
     current: int
     addr_references: Set[str]  # set of addresses the formula references
+    mode: NumericMode
+    program: List[Tuple[str, str]]
 
-    def __init__(self, tokens: List[Token]):
+    def __init__(self, tokens: List[Token], mode: NumericMode = numeric.INT):
         self.tokens = tokens
         self.current = 0
         self.addr_references = set()
+        self.mode = mode
+        self.program = []
 
     def parse(self) -> Tuple[Expr, Set[str]]:
         return self.parse_expr(), self.addr_references
@@ -48,7 +52,8 @@ class Parser:
             self.current += 1
 
             right = self.parse_term()
-            result = Parser.operator[op.type](result, right)
+            result = self.mode.operator[op.type](result, right)
+            self.program.append((op.type, ''))
 
         return result
 
@@ -61,22 +66,25 @@ class Parser:
             self.current += 1
 
             right = self.parse_factor()
-            result = Parser.operator[op.type](result, right)
+            result = self.mode.operator[op.type](result, right)
+            self.program.append((op.type, ''))
 
         return result
 
-    # «FACTOR» ≔ «INT» | «ADDR» | "-" «FACTOR» | "(" «EXPR» ")"
+    # «FACTOR» ≔ «INT» | «DECIMAL» | «ADDR» | "-" «FACTOR» | "(" «EXPR» ")"
     def parse_factor(self) -> Expr:
         if self.current < len(self.tokens):
             token = self.tokens[self.current]
-            if token.type == 'INT':
-                return self.parse_int()
+            if token.type in ('INT', 'DECIMAL'):
+                return self.parse_number()
             elif token.type == 'ADDR':
                 return self.parse_addr()
             elif token.type == '-':
                 self.current += 1
+                operand = self.parse_factor()
+                self.program.append(('NEG', ''))
 
-                return lambda sheet: -self.parse_factor()(sheet)
+                return negation(operand)
             elif token.type == '(':
                 self.current += 1
                 result = self.parse_expr()
@@ -97,16 +105,61 @@ class Parser:
 
         self.current += 1
         self.addr_references.add(token.value)
+        self.program.append(('ADDR', token.value))
 
-        return lambda sheet: sheet.get_val(token.value)
+        return reference(token.value)
 
     # «INT» ≔ [0-9]+
-    def parse_int(self) -> Expr:
+    # «DECIMAL» ≔ [0-9]+ "." [0-9]+
+    def parse_number(self) -> Expr:
         token = self.tokens[self.current]
 
         self.current += 1
+        self.program.append((token.type, token.value))
+
+        return constant(self.mode.literal(token.value))
+
+
+def constant(value: Number) -> Expr:
+    return lambda _: value
+
+
+def reference(addr: str) -> Expr:
+    return lambda sheet: sheet.get_val(addr)
+
+
+def negation(operand: Expr) -> Expr:
+    return lambda sheet: -operand(sheet)
+
+
+def compile_program(program: Tuple[Tuple[str, str], ...], mode: NumericMode) -> Expr:
+    stack = []
+    for type, value in program:
+        if type == 'ADDR':
+            stack.append(reference(value))
+        elif type in ('INT', 'DECIMAL'):
+            stack.append(constant(mode.literal(value)))
+        elif type == 'NEG':
+            stack.append(negation(stack.pop()))
+        else:
+            rhs = stack.pop()
+            stack.append(mode.operator[type](stack.pop(), rhs))
 
-        return lambda _: int(token.value)
+    return stack.pop()
+
+
+# Compiles `program` the first time it's evaluated so that cells whose values are already known cost nothing to load.
+def compile_lazily(program: Tuple[Tuple[str, str], ...], mode: NumericMode) -> Expr:
+    compiled: Optional[Expr] = None
+
+    def expr(sheet: 'Sheet') -> Number:
+        nonlocal compiled
+        if compiled is None:
+            compiled = compile_program(program, mode)
+
+        return compiled(sheet)
+
+    return expr
 
 
 def tokenize(expression: str) -> List[Token]:
@@ -119,7 +172,17 @@ def tokenize(expression: str) -> List[Token]:
             while current < len(expression) and expression[current].isdigit():
                 current += 1
 
-            tokens.append(Token('INT', expression[start:current]))
+            if current < len(expression) and expression[current] == '.':
+                current += 1
+                if current == len(expression) or not expression[current].isdigit():
+                    raise ValueError("Malformed decimal")
+
+                while current < len(expression) and expression[current].isdigit():
+                    current += 1
+
+                tokens.append(Token('DECIMAL', expression[start:current]))
+            else:
+                tokens.append(Token('INT', expression[start:current]))
         elif char.isupper():
             start = current
             while current < len(expression) and expression[current].isupper():
@@ -141,3 +204,10 @@ def tokenize(expression: str) -> List[Token]:
             raise ValueError(f"Unexpected character: {char}")
 
     return tokens
+
+
+def tokenize_contents(contents: str) -> List[Token]:
+    if contents[0] == '=':
+        return tokenize(contents[1:])
+    else:  # number
+        return tokenize(contents)
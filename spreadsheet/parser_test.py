@@ -1,5 +1,8 @@
 import unittest
 
+from decimal import Decimal
+
+import numeric
 import parser
 import spreadsheet
 
@@ -13,6 +16,19 @@ class TestTokenize(unittest.TestCase):
 
         self.assertListEqual(expected, actual)
 
+    def test_decimal(self):
+        expected = [parser.Token("DECIMAL", "12.34")]
+
+        actual = parser.tokenize("12.34")
+
+        self.assertListEqual(expected, actual)
+
+    def test_malformed_decimal(self):
+        with self.assertRaises(ValueError) as ctx:
+            parser.tokenize("12.+1")
+
+        self.assertEqual(str(ctx.exception), "Malformed decimal")
+
     def test_addr(self):
         expected = [parser.Token("ADDR", "AOEU1234")]
 
@@ -87,16 +103,53 @@ class TestTokenize(unittest.TestCase):
         self.assertEqual(str(ctx.exception), "Unexpected character: …")
 
 
-class TestParserParseInt(unittest.TestCase):
+class TestParserParseNumber(unittest.TestCase):
     def test_single_call(self):
         expected = 1234
 
         p = parser.Parser([(parser.Token("INT", "1234"))])
 
-        actual = p.parse_int()
+        actual = p.parse_number()
 
         self.assertEqual(expected, actual(spreadsheet.Sheet()))
 
+    def test_float_mode(self):
+        expected = 1234.0
+
+        p = parser.Parser([(parser.Token("INT", "1234"))], numeric.FLOAT)
+
+        actual = p.parse_number()(spreadsheet.Sheet())
+
+        self.assertIsInstance(actual, float)
+        self.assertEqual(expected, actual)
+
+    def test_decimal_float_mode(self):
+        expected = 12.34
+
+        p = parser.Parser([(parser.Token("DECIMAL", "12.34"))], numeric.FLOAT)
+
+        actual = p.parse_number()
+
+        self.assertEqual(expected, actual(spreadsheet.Sheet()))
+
+    def test_decimal_fixed_point_mode(self):
+        expected = Decimal("12.340")
+
+        p = parser.Parser([(parser.Token("DECIMAL", "12.34"))], numeric.fixed_point(3))
+
+        actual = p.parse_number()(spreadsheet.Sheet())
+
+        self.assertEqual(expected, actual)
+        self.assertEqual(expected.as_tuple(), actual.as_tuple())
+
+    def test_decimal_int_mode(self):
+        with self.assertRaises(ValueError) as ctx:
+            p = parser.Parser([(parser.Token("DECIMAL", "12.34"))])
+
+            _ = p.parse_number()
+
+        self.assertEqual(str(ctx.exception), "Decimal literal in int mode: 12.34")
+
 
 class TestParserParseAddr(unittest.TestCase):
     def test(self):
@@ -291,6 +344,39 @@ class TestParserParseExpr(unittest.TestCase):
 
         self.assertEqual(expected, actual)
 
+    def test_negative_reference(self):
+        sheet = spreadsheet.Sheet()
+        sheet.get_val = Mock(return_value=3)
+
+        p = parser.Parser(parser.tokenize("-A1"))
+
+        actual, addr_refs = p.parse()
+
+        self.assertEqual(-3, actual(sheet))
+        self.assertEqual({"A1"}, addr_refs)
+
+
+class TestParserProgram(unittest.TestCase):
+    def test_program(self):
+        expected = (("INT", "2"), ("ADDR", "A1"), ("NEG", ""), ("INT", "3"), ("+", ""), ("*", ""))
+
+        p = parser.Parser(parser.tokenize("2*(-A1+3)"))
+        p.parse()
+
+        self.assertEqual(expected, tuple(p.program))
+
+    def test_compile_program(self):
+        expected = 1.75  # (5*A1 - -1.0) / 2
+
+        sheet = spreadsheet.Sheet()
+        sheet.get_val = Mock(return_value=0.5)
+
+        actual = parser.compile_program(
+            (("INT", "5"), ("ADDR", "A1"), ("*", ""), ("DECIMAL", "1.0"), ("NEG", ""), ("-", ""), ("INT", "2"), ("/", "")),
+            numeric.FLOAT)
+
+        self.assertEqual(expected, actual(sheet))
+
 
 if __name__ == '__main__':
     unittest.main()
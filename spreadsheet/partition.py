@@ -0,0 +1,299 @@
+import multiprocessing
+from collections import defaultdict
+from multiprocessing.connection import Connection
+from multiprocessing.shared_memory import SharedMemory
+from typing import Callable, Dict, List, Optional, Set, Tuple
+
+import numeric
+from addr import Addr
+from expr import Number
+from numeric import NumericMode
+from spreadsheet import Cell, Sheet
+
+Partitioner = Callable[[Addr], int]
+
+
+def col_index(col: str) -> int:
+    result = 0
+    for c in col:
+        result = result * 26 + ord(c) - ord('A') + 1
+
+    return result
+
+
+def column_blocks(width: int) -> Partitioner:
+    return lambda addr: (col_index(addr.col) - 1) // width
+
+
+def row_blocks(height: int) -> Partitioner:
+    return lambda addr: (addr.row - 1) // height
+
+
+# Owns one partition's cells. Boundary values arrive and leave as payloads: a float64 slot index in FLOAT mode, the value
+# itself otherwise.
+class Worker:
+    sheet: Sheet
+    exports: Dict[str, Number]  # exported address -> value last reported
+    slots: Dict[str, int]  # exported address -> slot in `shm`
+    shm: Optional[SharedMemory]
+    values: Optional[memoryview]  # `shm` as float64s
+
+    def __init__(self, mode: NumericMode, shm_name: Optional[str]):
+        self.sheet = Sheet(mode)
+        self.exports = {}
+        self.slots = {}
+        self.shm = None
+        self.values = None
+
+        if shm_name:
+            self.attach(shm_name)
+
+    def attach(self, shm_name: str):
+        self.detach()
+
+        self.shm = SharedMemory(name=shm_name)
+        self.values = self.shm.buf.cast('d')
+
+    def detach(self):
+        if self.shm:
+            self.values.release()
+            self.shm.close()
+
+    def set_contents(self, addr: str, contents: str, imports: Dict[str, Number]) -> Dict[str, Number]:
+        for a, payload in imports.items():
+            self.set_import(a, payload)
+        self.sheet.set_contents(addr, contents)
+
+        return self.changed_exports()
+
+    def set_values(self, imports: Dict[str, Number]) -> Dict[str, Number]:
+        self.sheet.update_vals([self.set_import(a, payload) for a, payload in imports.items()])
+
+        return self.changed_exports()
+
+    def set_import(self, addr: str, payload: Number) -> Cell:
+        val = self.values[payload] if self.shm else payload
+
+        cell = self.sheet.get_cell(Addr(addr))
+        cell.set_expr(lambda _: val)
+        cell.val = val
+
+        return cell
+
+    def export(self, addr: str, slot: Optional[int]) -> Number:
+        self.exports[addr] = self.sheet.get_val(addr)
+        if slot is not None:
+            self.slots[addr] = slot
+
+        return self.publish(addr, self.exports[addr])
+
+    def unexport(self, addr: str):
+        del self.exports[addr]
+        self.slots.pop(addr, None)
+
+    def publish(self, addr: str, val: Number) -> Number:
+        if addr in self.slots:
+            self.values[self.slots[addr]] = val
+
+            return self.slots[addr]
+
+        return val
+
+    def get_val(self, addr: str) -> Number:
+        return self.sheet.get_val(addr)
+
+    def changed_exports(self) -> Dict[str, Number]:
+        result = {}
+        for addr, last in self.exports.items():
+            val = self.sheet.get_val(addr)
+            if val != last:
+                result[addr] = self.publish(addr, val)
+                self.exports[addr] = val
+
+        return result
+
+
+def run_worker(conn: Connection, mode: NumericMode, shm_name: Optional[str]):
+    worker = Worker(mode, shm_name)
+    while True:
+        command, args = conn.recv()
+        if command == 'stop':
+            worker.detach()
+            break
+
+        try:
+            conn.send((True, getattr(worker, command)(*args)))
+        except Exception as e:
+            conn.send((False, e))
+
+    conn.close()
+
+
+# Spreads a sheet over one worker process per partition; an edit only reaches partitions through boundary edges whose
+# values changed. FLOAT boundary values go through shared memory, others through the workers' pipes.
+class PartitionedSheet:
+    INITIAL_SLOTS = 64
+
+    mode: NumericMode
+    partitioner: Partitioner
+    conns: List[Connection]
+    processes: List[multiprocessing.Process]
+    boundary_edges: defaultdict[str, Set[str]]  # exported address -> addresses in other partitions that reference it
+    imports: Dict[str, Set[str]]  # address -> addresses in other partitions that it references
+    shm: Optional[SharedMemory]
+    capacity: int  # number of slots in `shm`
+    slots: Dict[str, int]  # exported address -> slot in `shm`
+    free_slots: List[int]
+
+    def __init__(self, partitions: int, partitioner: Optional[Partitioner] = None, mode: NumericMode = numeric.INT):
+        self.mode = mode
+        self.partitioner = partitioner or column_blocks(1)
+        self.conns = []
+        self.processes = []
+        self.boundary_edges = defaultdict(set)
+        self.imports = {}
+        self.shm = None
+        self.capacity = 0
+        self.slots = {}
+        self.free_slots = []
+
+        if mode is numeric.FLOAT:
+            self.capacity = PartitionedSheet.INITIAL_SLOTS
+            self.shm = SharedMemory(create=True, size=self.capacity * 8)
+
+        for _ in range(partitions):
+            conn, child_conn = multiprocessing.Pipe()
+            process = multiprocessing.Process(
+                target=run_worker,
+                args=(child_conn, mode, self.shm.name if self.shm else None),
+                daemon=True)
+            process.start()
+            child_conn.close()
+
+            self.conns.append(conn)
+            self.processes.append(process)
+
+    def __enter__(self) -> 'PartitionedSheet':
+        return self
+
+    def __exit__(self, *_):
+        self.close()
+
+    def close(self):
+        for conn, process in zip(self.conns, self.processes):
+            conn.send(('stop', ()))
+            conn.close()
+            process.join()
+
+        self.conns = []
+        self.processes = []
+
+        if self.shm:
+            self.shm.close()
+            self.shm.unlink()
+            self.shm = None
+
+    def partition_of(self, addr: str) -> int:
+        return self.partitioner(Addr(addr)) % len(self.conns)
+
+    # Returns the exported addresses still changing when propagation gave up on a cycle; empty when values settled.
+    def set_contents(self, addr: str, contents: str) -> Set[str]:
+        addr = str(Addr(addr))
+        partition = self.partition_of(addr)
+
+        _, addr_refs = Sheet.convert_contents_to_callable(contents, self.mode)
+        refs = {str(a) for a in addr_refs if self.partition_of(str(a)) != partition}
+        old_refs = self.imports.get(addr, set())
+
+        for ref in old_refs.difference(refs):
+            self.boundary_edges[ref].remove(addr)
+            if not self.boundary_edges[ref]:
+                del self.boundary_edges[ref]
+                self.call(self.partition_of(ref), 'unexport', ref)
+                if self.shm:
+                    self.free_slots.append(self.slots.pop(ref))
+
+        imports = {}
+        for ref in refs.difference(old_refs):
+            if ref not in self.boundary_edges:
+                slot = None
+                if self.shm:
+                    slot = self.allocate_slot()
+                    self.slots[ref] = slot
+                imports[ref] = self.call(self.partition_of(ref), 'export', ref, slot)
+            elif self.shm:
+                imports[ref] = self.slots[ref]  # the exporting worker keeps the slot up to date
+            else:
+                imports[ref] = self.call(self.partition_of(ref), 'get_val', ref)
+            self.boundary_edges[ref].add(addr)
+        self.imports[addr] = refs
+
+        return self.propagate(self.call(partition, 'set_contents', addr, contents, imports))
+
+    def get_val(self, addr: str) -> Number:
+        addr = str(Addr(addr))
+
+        return self.call(self.partition_of(addr), 'get_val', addr)
+
+    def allocate_slot(self) -> int:
+        if self.free_slots:
+            return self.free_slots.pop()
+
+        # with no free slots, slots 0 … len(self.slots) - 1 are all in use
+        slot = len(self.slots)
+        if slot == self.capacity:
+            old = self.shm
+            self.shm = SharedMemory(create=True, size=self.capacity * 2 * 8)
+            self.shm.buf[:self.capacity * 8] = old.buf[:self.capacity * 8]
+            self.capacity *= 2
+
+            for partition in range(len(self.conns)):
+                self.call(partition, 'attach', self.shm.name)
+
+            old.close()
+            old.unlink()
+
+        return slot
+
+    def propagate(self, changed: Dict[str, Number]) -> Set[str]:
+        # In an acyclic graph, each round settles at least one more link of the longest chain of boundary edges, so
+        # needing more rounds than there are exported cells means values are chasing each other around a cycle. Like
+        # `Sheet`, the cycle is accepted rather than raised; its values are left as they are and reported.
+        rounds = 0
+        while changed:
+            rounds += 1
+            if rounds > len(self.boundary_edges):
+                return set(changed)
+
+            pending = defaultdict(dict)
+            for addr, val in changed.items():
+                for dependent in self.boundary_edges.get(addr, ()):
+                    pending[self.partition_of(dependent)][addr] = val
+
+            for partition, values in pending.items():
+                self.conns[partition].send(('set_values', (values,)))
+
+            # drain every reply before raising so that no pipe is left holding an unread result
+            replies = [self.conns[partition].recv() for partition in pending]
+            changed = {}
+            for ok, result in replies:
+                if not ok:
+                    raise result
+                changed.update(result)
+
+        return set()
+
+    def call(self, partition: int, command: str, *args):
+        self.conns[partition].send((command, args))
+
+        return self.receive(partition)
+
+    def receive(self, partition: int):
+        ok, result = self.conns[partition].recv()
+        if not ok:
+            raise result
+
+        return result
+
+    def boundary_edge_list(self) -> List[Tuple[str, str]]:
+        return [(ref, dependent) for ref, dependents in self.boundary_edges.items() for dependent in dependents]
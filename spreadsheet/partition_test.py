@@ -0,0 +1,131 @@
+import unittest
+
+import numeric
+from addr import Addr
+from partition import PartitionedSheet, col_index, column_blocks, row_blocks
+
+
+class TestPartitioners(unittest.TestCase):
+    def test_col_index(self):
+        self.assertEqual(1, col_index("A"))
+        self.assertEqual(26, col_index("Z"))
+        self.assertEqual(27, col_index("AA"))
+
+    def test_column_blocks(self):
+        partitioner = column_blocks(2)
+
+        self.assertEqual(0, partitioner(Addr("A1")))
+        self.assertEqual(0, partitioner(Addr("B7")))
+        self.assertEqual(1, partitioner(Addr("C1")))
+
+    def test_row_blocks(self):
+        partitioner = row_blocks(10)
+
+        self.assertEqual(0, partitioner(Addr("C10")))
+        self.assertEqual(1, partitioner(Addr("A11")))
+
+
+class TestPartitionedSheet(unittest.TestCase):
+    def test_set_contents_within_partition(self):
+        with PartitionedSheet(2) as sheet:
+            sheet.set_contents("A1", "2")
+            sheet.set_contents("A2", "=A1*3")
+
+            self.assertEqual(6, sheet.get_val("A2"))
+            self.assertEqual([], sheet.boundary_edge_list())
+
+    def test_set_contents_across_partitions(self):
+        with PartitionedSheet(2) as sheet:
+            sheet.set_contents("A1", "2")
+            sheet.set_contents("B1", "=A1+1")
+            sheet.set_contents("C1", "=B1*A1")
+
+            self.assertEqual(3, sheet.get_val("B1"))
+            self.assertEqual(6, sheet.get_val("C1"))
+            self.assertEqual({("A1", "B1"), ("B1", "C1")}, set(sheet.boundary_edge_list()))
+
+            sheet.set_contents("A1", "5")
+
+            self.assertEqual(6, sheet.get_val("B1"))
+            self.assertEqual(30, sheet.get_val("C1"))
+
+    def test_set_contents_reverse(self):
+        with PartitionedSheet(2) as sheet:
+            sheet.set_contents("B1", "=A1")
+            sheet.set_contents("A1", "2")
+
+            self.assertEqual(2, sheet.get_val("B1"))
+
+    def test_boundary_edge_removed(self):
+        with PartitionedSheet(2) as sheet:
+            sheet.set_contents("A1", "2")
+            sheet.set_contents("B1", "=A1")
+            sheet.set_contents("B1", "3")
+            sheet.set_contents("A1", "4")
+
+            self.assertEqual([], sheet.boundary_edge_list())
+            self.assertEqual(3, sheet.get_val("B1"))
+
+    def test_float_mode(self):
+        with PartitionedSheet(3, mode=numeric.FLOAT) as sheet:
+            sheet.set_contents("A1", "1.5")
+            sheet.set_contents("B1", "=A1/2")
+
+            self.assertEqual(0.75, sheet.get_val("B1"))
+
+    def test_float_mode_many_exports(self):
+        with PartitionedSheet(2, mode=numeric.FLOAT) as sheet:
+            for i in range(1, PartitionedSheet.INITIAL_SLOTS * 2 + 2):
+                sheet.set_contents(f"A{i}", f"{i}.5")
+                sheet.set_contents(f"B{i}", f"=A{i}*2")
+
+            sheet.set_contents("A3", "0.25")
+            sheet.set_contents("C1", "=B3+B100")
+
+            self.assertEqual(3.0, sheet.get_val("B1"))
+            self.assertEqual(0.5, sheet.get_val("B3"))
+            self.assertEqual(201.0, sheet.get_val("B100"))
+            self.assertEqual(201.5, sheet.get_val("C1"))
+
+    def test_multiple_imports(self):
+        with PartitionedSheet(2) as sheet:
+            sheet.set_contents("A1", "1")
+            sheet.set_contents("A2", "=A1*2")
+            sheet.set_contents("B1", "=A1+A2")
+            sheet.set_contents("B2", "=B1*A2")
+
+            sheet.set_contents("A1", "3")
+
+            self.assertEqual(9, sheet.get_val("B1"))
+            self.assertEqual(54, sheet.get_val("B2"))
+
+    def test_settled(self):
+        with PartitionedSheet(2) as sheet:
+            sheet.set_contents("A1", "1")
+
+            self.assertEqual(set(), sheet.set_contents("B1", "=A1"))
+
+    def test_cyclic_reference(self):
+        with PartitionedSheet(3) as sheet:
+            sheet.set_contents("A1", "=B1")
+            sheet.set_contents("C1", "=A1")
+            unsettled = sheet.set_contents("B1", "=A1+C1+1")
+
+            self.assertTrue(unsettled)
+            self.assertLessEqual(unsettled, {"A1", "B1", "C1"})
+
+    def test_cyclic_reference_broken(self):
+        with PartitionedSheet(2) as sheet:
+            sheet.set_contents("B1", "=A1")
+            self.assertTrue(sheet.set_contents("A1", "=B1+1"))
+
+            self.assertEqual(set(), sheet.set_contents("A1", "5"))
+            sheet.set_contents("C1", "=B1*2")
+
+            self.assertEqual(5, sheet.get_val("B1"))
+            self.assertEqual(10, sheet.get_val("C1"))
+            self.assertEqual({("A1", "B1"), ("B1", "C1")}, set(sheet.boundary_edge_list()))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,41 +1,57 @@
-from collections import defaultdict
+from collections import defaultdict, deque
 from typing import Dict, List, Optional, Set, Tuple
 
+import numeric
 import parser
 from addr import Addr
-from expr import Expr
+from cache import FormulaCache, paused_gc
+from expr import Expr, Number
+from numeric import NumericMode
 
 
 class Cell:
     dependents: Set['Cell']  # cells that depend on this one
     dependencies: Set['Cell']  # cells that this cell depends on
     expr: Expr
-    val: int
+    val: Number
 
-    def __init__(self):
+    def __init__(self, zero: Number = 0):
         self.dependents = set()
         self.dependencies = set()
-        self.expr = lambda _: 0
-        self.val = 0
+        self.expr = lambda _: zero
+        self.val = zero
 
     @staticmethod
     def topologically_sorted(cells: List['Cell']):
+        result = Cell.partially_topologically_sorted(cells)
+
+        if len(result) != len(set(cells)):
+            raise ValueError("Cyclic reference detected")
+
+        return result
+
+    # Sorts the cells that aren't in or downstream of a cycle, leaving out the rest. Only dependencies among `cells`
+    # count, so a subset of a sheet can be sorted on its own.
+    @staticmethod
+    def partially_topologically_sorted(cells: List['Cell']):
         result = []
 
-        in_degree = {c: len(c.dependencies) for c in cells}
+        in_degree = dict.fromkeys(cells, 0)
+        for c in in_degree:
+            for d in c.dependents:
+                if d in in_degree:
+                    in_degree[d] += 1
 
-        queue = [c for c in in_degree if in_degree[c] == 0]
+        queue = deque(c for c in in_degree if in_degree[c] == 0)
         while queue:
-            cell = queue.pop(0)
+            cell = queue.popleft()
             result.append(cell)
 
             for d in cell.dependents:
-                in_degree[d] -= 1
-                if in_degree[d] == 0:
-                    queue.append(d)
-
-        if len(result) != len(in_degree):
-            raise ValueError("Cyclic reference detected")
+                if d in in_degree:
+                    in_degree[d] -= 1
+                    if in_degree[d] == 0:
+                        queue.append(d)
 
         return result
 
@@ -55,7 +71,7 @@ class Cell:
     def remove_dependent(self, dependent: 'Cell'):
         self.dependents.remove(dependent)
 
-    def get_val(self) -> int:
+    def get_val(self) -> Number:
         return self.val
 
     def update_val(self, sheet: 'Sheet'):
@@ -77,13 +93,15 @@ class Cell:
 class Sheet:
     cells: defaultdict[str, defaultdict[int, Cell]]
     topologically_sorted_cells: List[Cell]
+    mode: NumericMode
 
-    def __init__(self):
-        self.cells = defaultdict(lambda: defaultdict(Cell))
+    def __init__(self, mode: NumericMode = numeric.INT):
+        self.cells = defaultdict(lambda: defaultdict(lambda: Cell(mode.zero)))
         self.topologically_sorted_cells = []
+        self.mode = mode
 
     def set_contents(self, addr: str, contents: str):
-        expr, addr_refs = self.convert_contents_to_callable(contents)
+        expr, addr_refs = self.convert_contents_to_callable(contents, self.mode)
 
         cell = self.get_cell(Addr(addr))
         cell.set_expr(expr)
@@ -103,17 +121,145 @@ class Sheet:
     def get_cell(self, addr: Addr) -> Cell:
         return self.cells[addr.col][addr.row]
 
-    def get_val(self, addr: str) -> int:
+    def get_val(self, addr: str) -> Number:
         return self.get_cell(Addr(addr)).get_val()
 
+    # Loads a whole sheet at once, sorting and evaluating each cell once rather than once per `set_contents` call. As
+    # with `set_contents`, cells in or downstream of a cycle are still evaluated, after everything else.
+    @staticmethod
+    def load(contents: Dict[str, str], mode: NumericMode = numeric.INT, cache: Optional[FormulaCache] = None) -> 'Sheet':
+        sheet = Sheet(mode)
+
+        with paused_gc():
+            if cache is not None:
+                sheet.restore(contents, cache)
+            else:
+                sheet.load_contents(contents)
+
+        return sheet
+
+    def load_contents(self, contents: Dict[str, str]):
+        for addr, c in contents.items():
+            expr, addr_refs = Sheet.convert_contents_to_callable(c, self.mode)
+
+            cell = self.get_cell(Addr(addr))
+            cell.set_expr(expr)
+            cell.set_dependencies({self.get_cell(a) for a in addr_refs})
+
+        self.topologically_sorted_cells = Sheet.sorted_with_cycles_last(
+            [cell for rows in self.cells.values() for cell in rows.values()])
+        self.update_vals(self.topologically_sorted_cells)
+
+    # Builds the sheet from what `cache` kept of the last load. Unchanged formulas aren't parsed and are compiled only
+    # when next evaluated. Only the cells whose contents changed and the cells downstream of them are sorted and
+    # evaluated again; everything else keeps its cached place in the order and, in the same mode, its value.
+    def restore(self, contents: Dict[str, str], cache: FormulaCache):
+        cells = self.cells
+        same_mode = cache.mode == self.mode.reduced
+
+        old_order = []
+        for (col, row), val in zip(cache.order, cache.values):
+            cell = cells[col][row]
+            if same_mode:
+                cell.val = val
+            old_order.append(cell)
+
+        changed = []  # cells whose contents were added, modified or removed
+        locations = {}
+        for addr, c in contents.items():
+            if cache.contents.get(addr) == c:
+                program, refs = cache.formulas[c]
+                expr = parser.compile_lazily(program, self.mode)
+            else:
+                expr, refs = cache.convert_contents_to_callable(c, self.mode)
+
+            if addr in cache.locations:
+                col, row = cache.locations[addr]
+            else:
+                a = Addr(addr)
+                col, row = a.col, a.row
+            locations[addr] = (col, row)
+
+            cell = cells[col][row]
+            cell.expr = expr
+            if refs:
+                # the cells are new so there are no old dependencies to unlink
+                cell.dependencies = {cells[ref_col][ref_row] for ref_col, ref_row in refs}
+                for d in cell.dependencies:
+                    d.dependents.add(cell)
+            if cache.contents.get(addr) != c:
+                changed.append(cell)
+
+        # cells no longer in the sheet are dropped unless still referenced, in which case any old contents are cleared
+        removed = {cache.locations[addr] for addr in cache.contents.keys() - contents.keys()}
+        dropped = set()
+        for col, row in set(cache.order).difference(locations.values()):
+            cell = cells[col][row]
+            if not cell.dependents:
+                del cells[col][row]
+                dropped.add(cell)
+            elif (col, row) in removed:
+                changed.append(cell)
+
+        old_cells = set(old_order)
+        location_of = {cell: (col, row) for col, rows in cells.items() for row, cell in rows.items()}
+        changed.extend(cell for cell in location_of if cell not in old_cells)
+
+        affected = set(changed)
+        queue = deque(changed)
+        while queue:
+            for d in queue.popleft().dependents:
+                if d not in affected:
+                    affected.add(d)
+                    queue.append(d)
+
+        if affected or dropped:
+            self.topologically_sorted_cells = [c for c in old_order if c not in affected and c not in dropped]
+            # in sheet order, like `load_contents`, so that cycles are evaluated the same way
+            self.topologically_sorted_cells.extend(
+                Sheet.sorted_with_cycles_last([c for c in location_of if c in affected]))
+        else:
+            self.topologically_sorted_cells = old_order
+
+        if same_mode:
+            for c in self.topologically_sorted_cells[len(self.topologically_sorted_cells) - len(affected):]:
+                c.val = c.expr(self)
+        else:
+            self.update_vals(self.topologically_sorted_cells)
+
+        cache.mode = self.mode.reduced
+        cache.contents = dict(contents)
+        cache.locations = locations
+        cache.order = [location_of[c] for c in self.topologically_sorted_cells]
+        cache.values = [c.val for c in self.topologically_sorted_cells]
+
+    # the cells in topological order followed by those in or downstream of a cycle, which can't be sorted
     @staticmethod
-    def convert_contents_to_callable(expr: str) -> Tuple[Expr, Set[Addr]]:
-        if expr[0] == '=':
-            tokens = parser.tokenize(expr[1:])
-        else:  # int
-            tokens = parser.tokenize(expr)
+    def sorted_with_cycles_last(cells: List[Cell]) -> List[Cell]:
+        result = Cell.partially_topologically_sorted(cells)
+        if len(result) != len(cells):
+            sorted_cells = set(result)
+            result.extend(c for c in cells if c not in sorted_cells)
+
+        return result
 
-        p = parser.Parser(tokens)
+    # evaluates `cells` and everything downstream of them in one pass over the topological order
+    def update_vals(self, cells: List[Cell]):
+        subgraph = set(cells)
+        queue = deque(cells)
+        while queue:
+            for d in queue.popleft().dependents:
+                if d not in subgraph:
+                    subgraph.add(d)
+                    queue.append(d)
+
+        for c in self.topologically_sorted_cells:
+            if c in subgraph:
+                c.val = c.expr(self)
+
+    @staticmethod
+    def convert_contents_to_callable(expr: str, mode: NumericMode = numeric.INT) -> Tuple[Expr, Set[Addr]]:
+        p = parser.Parser(parser.tokenize_contents(expr), mode)
         expr, addr_refs = p.parse()
 
         return expr, {Addr(a) for a in addr_refs}
@@ -1,5 +1,7 @@
 import unittest
+from decimal import Decimal
 
+import numeric
 from addr import Addr
 from spreadsheet import Cell, Sheet
 
@@ -19,6 +21,13 @@ class TestConvertContentsToCallable(unittest.TestCase):
 
         self.assertEqual(expected, actual)
 
+    def test_float_mode(self):
+        expected = 2.5
+
+        actual = Sheet.convert_contents_to_callable("=5/2", numeric.FLOAT)[0](Sheet())
+
+        self.assertEqual(expected, actual)
+
 
 class TestCell(unittest.TestCase):
     def test_topologically_sorted_dependents(self):
@@ -158,6 +167,36 @@ class TestSheet(unittest.TestCase):
             ],
             sheet.topologically_sorted_cells)
 
+    def test_float_mode(self):
+        sheet = Sheet(numeric.FLOAT)
+        sheet.set_contents("A1", "1.5")
+        sheet.set_contents("A2", "=A1/2+B1")
+
+        self.assertEqual(0.75, sheet.get_val("A2"))
+        self.assertIsInstance(sheet.get_val("B1"), float)
+
+    def test_fixed_point_mode(self):
+        sheet = Sheet(numeric.fixed_point(2))
+        sheet.set_contents("A1", "10")
+        sheet.set_contents("A2", "=A1/3")
+
+        self.assertEqual(Decimal("3.33").as_tuple(), sheet.get_val("A2").as_tuple())
+        self.assertEqual(Decimal("0.00").as_tuple(), sheet.get_val("B1").as_tuple())
+
+    def test_load(self):
+        sheet = Sheet.load({"A2": "=A1+B1", "A1": "2", "B1": "=A1*3"})
+
+        self.assertEqual(2, sheet.get_val("A1"))
+        self.assertEqual(6, sheet.get_val("B1"))
+        self.assertEqual(8, sheet.get_val("A2"))
+        self.assertEqual(
+            [
+                sheet.get_cell(Addr("A1")),
+                sheet.get_cell(Addr("B1")),
+                sheet.get_cell(Addr("A2"))
+            ],
+            sheet.topologically_sorted_cells)
+
 
 if __name__ == '__main__':
     unittest.main()